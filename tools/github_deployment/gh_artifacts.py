@@ -5,9 +5,11 @@ GitHub Artifact Manager for snapcast_client
 A command-line tool to manage GitHub Actions artifacts and deploy to Hawkbit server.
 
 Usage:
-    python gh_artifacts.py list [--token TOKEN] [--count N]
+    python gh_artifacts.py list [--token TOKEN] [--count N] [--name NAME] [--sha SHA]
     python gh_artifacts.py download ARTIFACT_ID [--token TOKEN] [--output FILE]
-    python gh_artifacts.py deploy ARTIFACT_ID [--token TOKEN] [--hawkbit-url URL] [--username USER] [--password PASS]
+    python gh_artifacts.py deploy ARTIFACT_ID [DISTRIBUTION_NAME] [--no-assign] [--all-bundles]
+                                  [--dist-version VERSION] [--token TOKEN] [--hawkbit-url URL]
+                                  [--username USER] [--password PASS]
     python gh_artifacts.py status [--hawkbit-url URL] [--username USER] [--password PASS]
 
 Environment Variables:
@@ -15,26 +17,166 @@ Environment Variables:
     HAWKBIT_URL: Default Hawkbit server URL (e.g., http://192.168.2.44:8080)
     HAWKBIT_USERNAME: Default Hawkbit username
     HAWKBIT_PASSWORD: Default Hawkbit password
+
+GitHub API responses (ETags), commit messages and the most recently
+downloaded artifacts are cached under ~/.cache/gh_artifacts.
 """
 import argparse
+import atexit
+import contextlib
+import functools
+import hashlib
+import io
 import json
 import os
+import shutil
 import sys
+import threading
 import time
+import uuid
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 import tempfile
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 
+try:
+    # Optional: orjson encodes/decodes API payloads several times faster than json
+    import orjson
+    
+    _loads = orjson.loads
+    
+    def _dumps(obj, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+except ImportError:
+    _loads = json.loads
+    
+    def _dumps(obj, pretty: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if pretty else None).encode()
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    # Optional: without requests-toolbelt uploads stream through _MultipartFileStream
+    MultipartEncoder = None
+
 # GitHub repository details
 REPO_OWNER = "FosterCL1"
 REPO_NAME = "snapcast_client"
 GITHUB_API = "https://api.github.com"
+GITHUB_MAX_PER_PAGE = 100
+
+# When fewer GitHub API requests than this remain, wait for the rate limit
+# window to reset before sending the next one
+GITHUB_RATE_LIMIT_FLOOR = 10
+
+# Block size for copying downloads and hashing files, and for
+# sending request bodies; large blocks keep the per-call overhead low on fast
+# links and disks
+_COPY_BUF = 1 << 20
+
+# urllib3 2.x added the per-connection send block size (and its pool key)
+_URLLIB3_V2 = int(urllib3.__version__.split('.')[0]) >= 2
+
+
+class _BulkAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections send request bodies in _COPY_BUF blocks
+    rather than urllib3's default 16 KiB, so a large upload takes far fewer
+    read and send calls. urllib3 1.x pools can't take a block size, so there
+    it behaves like a plain HTTPAdapter.
+    """
+    
+    def init_poolmanager(self, *args, **kwargs):
+        if _URLLIB3_V2:
+            kwargs.setdefault("blocksize", _COPY_BUF)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _make_session(retries: Optional[Retry] = None) -> requests.Session:
+    """
+    Create a session with a connection pool sized for the worker threads.
+    Idempotent requests are retried with backoff on rate limiting and
+    transient server errors, unless a different retry policy is given.
+    """
+    session = requests.Session()
+    if retries is None:
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = _BulkAdapter(pool_connections=10, pool_maxsize=32, pool_block=False, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# One session per service so keep-alive connections to GitHub and Hawkbit are
+# reused across calls instead of paying a new TCP/TLS handshake per request
+_gh_session = _make_session(Retry(
+    # Ride out GitHub hiccups rather than failing (and re-downloading) the whole
+    # command; waits 0.5s, 1s, 2s, ... or whatever Retry-After asks for
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    respect_retry_after_header=True
+))
+_hb_session = _make_session()
+
+# Time (epoch seconds) until which GitHub calls should wait, set when a
+# response reports the rate limit as nearly exhausted
+_gh_rate_limit_reset = 0.0
+
+# Request headers shared by the Hawkbit REST calls
+_ACCEPT_JSON = {"Accept": "application/json"}
+_JSON_HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+_HAL_HEADERS = {"Content-Type": "application/json", "Accept": "application/hal+json"}
+
+# Column layouts of the artifact listing and the target status table
+_ROW_FMT = "{:<12} {:<20} {:<10} {:<12} {}"
+_STATUS_ROW_FMT = "{:<25} {:<15} {:<15} {:<15} {}"
+
+# On-disk cache of ETag-validated GitHub responses (URL -> etag + body)
+ETAG_CACHE_FILE = Path.home() / ".cache" / "gh_artifacts" / "etags.json"
+ETAG_CACHE_SIZE = 100
+
+# Downloaded artifact zips, keyed by artifact ID (an artifact's content never changes)
+ARTIFACT_CACHE_DIR = Path.home() / ".cache" / "gh_artifacts" / "artifacts"
+ARTIFACT_CACHE_SIZE = 3
+
+# RAUC bundles up to this size are inflated into memory and uploaded from
+# there; larger ones are streamed out of the zip
+RAUCB_IN_MEMORY_MAX = 256 << 20
 
+_etag_cache: Optional[Dict[str, Dict[str, str]]] = None
+_etag_cache_dirty = False
+_etag_lock = threading.Lock()
 
+# On-disk cache of commit headlines by SHA (a commit's message never changes)
+COMMIT_CACHE_FILE = Path.home() / ".cache" / "gh_artifacts" / "commits.json"
+COMMIT_CACHE_SIZE = 500
+_commit_cache: Optional[Dict[str, str]] = None
+_commit_cache_dirty = False
+
+# Keeps multi-line debug output from worker threads together
+_print_lock = threading.Lock()
+
+# Distribution set lookups made during this run, keyed by (base URL, name) and
+# holding (latest ID, next free version); updated when this tool creates a set
+_distribution_cache: Dict[Tuple[str, str], Tuple[Optional[int], str]] = {}
+_distribution_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4)
 def get_headers(token: Optional[str] = None) -> Dict[str, str]:
-    """Get headers with optional authentication."""
+    """
+    Get headers with optional authentication.
+    The result is cached per token, so callers must not mutate it; copy it
+    first if extra headers are needed.
+    """
     headers = {
         "Accept": "application/vnd.github+json",
         "X-GitHub-Api-Version": "2022-11-28"
@@ -44,13 +186,151 @@ def get_headers(token: Optional[str] = None) -> Dict[str, str]:
     return headers
 
 
+def _load_etag_cache() -> Dict[str, Dict[str, str]]:
+    """
+    Load the ETag cache from disk once per process. Caller holds _etag_lock.
+    Entries are kept in least to most recently used order.
+    """
+    global _etag_cache
+    if _etag_cache is None:
+        try:
+            with open(ETAG_CACHE_FILE, 'r') as f:
+                _etag_cache = json.load(f)
+        except (OSError, ValueError):
+            _etag_cache = {}
+        # Files written before the cache was bounded may be over the limit
+        _trim_etag_cache()
+    return _etag_cache
+
+
+def _trim_etag_cache() -> None:
+    """Evict the least recently used ETag entries beyond ETAG_CACHE_SIZE. Caller holds _etag_lock."""
+    global _etag_cache_dirty
+    while len(_etag_cache) > ETAG_CACHE_SIZE:
+        del _etag_cache[next(iter(_etag_cache))]
+        _etag_cache_dirty = True
+
+
+@atexit.register
+def _save_etag_cache() -> None:
+    """Write the ETag cache back to disk if it changed."""
+    if not _etag_cache_dirty:
+        return
+    try:
+        ETAG_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(ETAG_CACHE_FILE, 'w') as f:
+            json.dump(_etag_cache, f)
+    except OSError as e:
+        print(f"Warning: Could not write ETag cache: {e}", file=sys.stderr)
+
+
+def _load_commit_cache() -> Dict[str, str]:
+    """
+    Load the commit headline cache from disk once per process.
+    Entries are kept in least to most recently listed order.
+    """
+    global _commit_cache
+    if _commit_cache is None:
+        try:
+            with open(COMMIT_CACHE_FILE, 'r') as f:
+                _commit_cache = json.load(f)
+        except (OSError, ValueError):
+            _commit_cache = {}
+        # Files written before the cache was bounded may be over the limit
+        _trim_commit_cache()
+    return _commit_cache
+
+
+def _trim_commit_cache() -> None:
+    """Evict the least recently listed commit headlines beyond COMMIT_CACHE_SIZE."""
+    global _commit_cache_dirty
+    while len(_commit_cache) > COMMIT_CACHE_SIZE:
+        del _commit_cache[next(iter(_commit_cache))]
+        _commit_cache_dirty = True
+
+
+@atexit.register
+def _save_commit_cache() -> None:
+    """Write the commit headline cache back to disk if it changed."""
+    if not _commit_cache_dirty:
+        return
+    try:
+        COMMIT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(COMMIT_CACHE_FILE, 'w') as f:
+            json.dump(_commit_cache, f)
+    except OSError as e:
+        print(f"Warning: Could not write commit cache: {e}", file=sys.stderr)
+
+
+def _gh_request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a GitHub API request through the shared session.
+    If an earlier response reported the rate limit as nearly exhausted, wait
+    for the window to reset first instead of failing once it runs out.
+    Retries on 429/5xx (honouring Retry-After) are handled by the session.
+    """
+    global _gh_rate_limit_reset
+    wait = _gh_rate_limit_reset - time.time()
+    if wait > 0:
+        print(f"GitHub API rate limit nearly exhausted, waiting {wait:.0f}s for it to reset", file=sys.stderr)
+        time.sleep(wait)
+    
+    response = _gh_session.request(method, url, **kwargs)
+    
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if remaining and reset and int(remaining) < GITHUB_RATE_LIMIT_FLOOR:
+        _gh_rate_limit_reset = float(reset)
+    return response
+
+
+def github_get_json(url: str, token: Optional[str] = None, params: Optional[Dict] = None, cache: bool = True):
+    """
+    GET a GitHub API URL and return the decoded JSON body.
+    Sends the cached ETag as If-None-Match so unchanged resources come back
+    as 304 Not Modified, which does not count against the rate limit.
+    Pass cache=False for responses that are cached elsewhere or not worth
+    keeping, so they don't take up room in the ETag cache.
+    """
+    global _etag_cache_dirty
+    if not cache:
+        response = _gh_request("GET", url, headers=get_headers(token), params=params)
+        response.raise_for_status()
+        return _loads(response.content)
+    
+    key = requests.Request("GET", url, params=params).prepare().url
+    with _etag_lock:
+        cached = _load_etag_cache().get(key)
+    
+    headers = get_headers(token)
+    if cached:
+        headers = {**headers, "If-None-Match": cached["etag"]}
+    
+    response = _gh_request("GET", url, headers=headers, params=params)
+    if response.status_code == 304 and cached:
+        with _etag_lock:
+            # Mark the entry as most recently used
+            etag_cache = _load_etag_cache()
+            etag_cache[key] = etag_cache.pop(key, cached)
+            _etag_cache_dirty = True
+        return _loads(cached["body"])
+    response.raise_for_status()
+    
+    etag = response.headers.get("ETag")
+    if etag:
+        with _etag_lock:
+            etag_cache = _load_etag_cache()
+            etag_cache.pop(key, None)
+            etag_cache[key] = {"etag": etag, "body": response.text}
+            _etag_cache_dirty = True
+            _trim_etag_cache()
+    return _loads(response.content)
+
+
 def get_commit_message(commit_url: str, token: Optional[str] = None) -> str:
     """Get the commit message for a given commit URL."""
-    headers = get_headers(token)
     try:
-        response = requests.get(commit_url, headers=headers)
-        response.raise_for_status()
-        commit_data = response.json()
+        commit_data = github_get_json(commit_url, token, cache=False)
         return commit_data.get("commit", {}).get("message", "No commit message").split('\n')[0][:80]
     except Exception as e:
         print(f"  Warning: Could not get commit message: {e}", file=sys.stderr)
@@ -63,109 +343,214 @@ def get_pr_info(pr_url: str, token: Optional[str] = None) -> str:
     
     headers = get_headers(token)
     try:
-        response = requests.get(pr_url, headers=headers)
+        response = _gh_request("GET", pr_url, headers=headers)
         response.raise_for_status()
-        pr_data = response.json()
+        pr_data = _loads(response.content)
         return f"PR #{pr_url.split('/')[-1]}: {pr_data.get('title', '')}"
     except Exception as e:
         print(f"  Warning: Could not get PR info: {e}", file=sys.stderr)
         return ""
 
-def format_relative_time(timestamp_str: str) -> str:
-    """Convert ISO timestamp to relative time (e.g., '2 hours ago')."""
-    from datetime import datetime, timezone
+_SEC_MIN = 60
+_SEC_HOUR = 3600
+_SEC_DAY = 86400
+
+def format_relative_time(timestamp_str: str, now: Optional[datetime] = None) -> str:
+    """
+    Convert ISO timestamp to relative time (e.g., '2 hours ago').
+    Pass `now` when formatting many timestamps so they share one reference time.
+    """
     try:
-        created = datetime.strptime(timestamp_str, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-        now = datetime.now(timezone.utc)
-        delta = now - created
+        created = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+        if now is None:
+            now = datetime.now(timezone.utc)
         
-        seconds = delta.total_seconds()
-        if seconds < 60:
+        seconds = int((now - created).total_seconds())
+        if seconds < _SEC_MIN:
             return "just now"
-        elif seconds < 3600:
-            minutes = int(seconds / 60)
-            return f"{minutes}m ago"
-        elif seconds < 86400:
-            hours = int(seconds / 3600)
-            return f"{hours}h ago"
+        elif seconds < _SEC_HOUR:
+            return f"{seconds // _SEC_MIN}m ago"
+        elif seconds < _SEC_DAY:
+            return f"{seconds // _SEC_HOUR}h ago"
         else:
-            days = int(seconds / 86400)
-            return f"{days}d ago"
+            return f"{seconds // _SEC_DAY}d ago"
     except Exception:
         return "unknown"
 
-def list_artifacts(token: Optional[str] = None, count: int = 5) -> List[Dict]:
-    """List recent workflow artifacts with detailed information."""
-    url = f"{GITHUB_API}/repos/{REPO_OWNER}/{REPO_NAME}/actions/artifacts"
-    headers = get_headers(token)
+_COMMIT_FETCH_ERROR = "[Error fetching commit]"
+
+def _fetch_commit_headline(commit_url: str, token: Optional[str] = None) -> str:
+    """Get the first line of a commit message for the artifact listing."""
+    try:
+        # Headlines are kept in the commit cache; the full commit (with its
+        # file patches) is too large to be worth keeping in the ETag cache
+        commit_data = github_get_json(commit_url, token, cache=False)
+        return commit_data.get("commit", {}).get("message", "").split('\n')[0]
+    except requests.exceptions.HTTPError:
+        return ""
+    except Exception:
+        return _COMMIT_FETCH_ERROR
+
+def fetch_commit_messages_graphql(shas: List[str], token: str) -> Dict[str, str]:
+    """
+    Get the headline of several commits with a single GraphQL request.
+    Returns a mapping of sha -> commit headline. Commits the query couldn't
+    resolve (a GraphQL error or a null object, even with a 200 status) are
+    left out, so the caller can look them up another way. The GraphQL API
+    always requires authentication, so a token is mandatory here.
+    """
+    fields = " ".join(
+        f'c{i}: object(oid: "{sha}") {{ ... on Commit {{ messageHeadline }} }}'
+        for i, sha in enumerate(shas)
+    )
+    query = f'query {{ repo: repository(owner: "{REPO_OWNER}", name: "{REPO_NAME}") {{ {fields} }} }}'
+
+    response = _gh_request("POST", f"{GITHUB_API}/graphql", headers=get_headers(token), json={"query": query})
+    response.raise_for_status()
+    repo = (_loads(response.content).get("data") or {}).get("repo") or {}
+
+    messages = {}
+    for i, sha in enumerate(shas):
+        commit = repo.get(f"c{i}") or {}
+        if "messageHeadline" in commit:
+            messages[sha] = commit["messageHeadline"]
+    return messages
+
+def fetch_artifacts(token: Optional[str] = None, count: int = 5, name: Optional[str] = None, sha: Optional[str] = None) -> List[Dict]:
+    """
+    Fetch the most recent workflow artifacts, newest first.
+    Filtering by name and commit is done server-side: the name is passed to
+    the artifacts endpoint, and a commit SHA is resolved to its workflow runs
+    first so only those runs' artifacts are fetched.
+    """
+    repo_url = f"{GITHUB_API}/repos/{REPO_OWNER}/{REPO_NAME}"
+    params = {
+        "per_page": min(count, GITHUB_MAX_PER_PAGE),
+        "sort": "created_at",
+        "direction": "desc"
+    }
+    if name:
+        params["name"] = name
     
+    if not sha:
+        # GitHub caps per_page, so fetch further pages only until count is reached
+        artifacts = []
+        page = 1
+        while len(artifacts) < count:
+            batch = github_get_json(
+                f"{repo_url}/actions/artifacts", token, params={**params, "page": page}
+            ).get("artifacts", [])
+            artifacts.extend(batch)
+            if len(batch) < params["per_page"]:
+                break
+            page += 1
+        return artifacts[:count]
+    
+    runs = github_get_json(f"{repo_url}/actions/runs", token, params={"head_sha": sha}).get("workflow_runs", [])
+    artifacts = []
+    for run in runs:
+        artifacts.extend(github_get_json(
+            f"{repo_url}/actions/runs/{run['id']}/artifacts", token, params=params
+        ).get("artifacts", []))
+    artifacts.sort(key=lambda a: a.get("created_at", ""), reverse=True)
+    return artifacts[:count]
+
+
+def list_artifacts(token: Optional[str] = None, count: int = 5, name: Optional[str] = None, sha: Optional[str] = None) -> List[Dict]:
+    """List recent workflow artifacts with detailed information."""
+    global _commit_cache_dirty
     try:
         # First get the artifacts with workflow run information
-        response = requests.get(
-            url, 
-            headers=headers, 
-            params={
-                "per_page": count,
-                "sort": "created_at",
-                "direction": "desc"
-            }
-        )
-        response.raise_for_status()
-        artifacts = response.json().get("artifacts", [])
+        artifacts = fetch_artifacts(token, count, name=name, sha=sha)
         
         if not artifacts:
             print("No artifacts found.")
             return []
             
-        print(f"\nLast {len(artifacts)} artifacts for {REPO_OWNER}/{REPO_NAME}:\n")
+        # Fetch commit messages for all artifacts up front. Artifacts from the
+        # same run share a commit, so each unique sha is only looked up once.
+        shas = [a.get("workflow_run", {}).get("head_sha", "") for a in artifacts]
+        shas = list(dict.fromkeys(sha for sha in shas if sha))
+
+        # Headlines seen before come from the local cache, the rest from GitHub
+        commit_cache = _load_commit_cache()
+        commit_msgs = {sha: commit_cache[sha] for sha in shas if sha in commit_cache}
+        missing = [sha for sha in shas if sha not in commit_msgs]
+
+        fetched = {}
+        if token and missing:
+            # One GraphQL request covers every commit in the listing
+            try:
+                fetched = fetch_commit_messages_graphql(missing, token)
+            except requests.exceptions.RequestException:
+                fetched = {}
+
+        unresolved = [sha for sha in missing if sha not in fetched]
+        if unresolved:
+            # Unauthenticated, or GraphQL failed for some or all commits: fall back to REST, concurrently
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                futures = {
+                    executor.submit(
+                        _fetch_commit_headline,
+                        f"{GITHUB_API}/repos/{REPO_OWNER}/{REPO_NAME}/commits/{sha}",
+                        token
+                    ): sha
+                    for sha in unresolved
+                }
+                for future in as_completed(futures):
+                    fetched[futures[future]] = future.result()
+
+        for sha, msg in fetched.items():
+            if msg and msg != _COMMIT_FETCH_ERROR:
+                commit_cache[sha] = msg
+                _commit_cache_dirty = True
+        commit_msgs.update(fetched)
         
-        # Print header
-        print(f"{'ID':<12} {'Branch':<20} {'Commit':<10} {'Age':<12} {'Message'}")
-        print("-" * 100)
+        # Mark this listing's commits as the most recently used, then evict the oldest
+        listed = [sha for sha in shas if sha in commit_cache]
+        if listed and list(commit_cache)[-len(listed):] != listed:
+            for sha in listed:
+                commit_cache[sha] = commit_cache.pop(sha)
+            _commit_cache_dirty = True
+        _trim_commit_cache()
+
+        # Build the whole table and write it out in one go
+        rows = [
+            f"\nLast {len(artifacts)} artifacts for {REPO_OWNER}/{REPO_NAME}:\n",
+            _ROW_FMT.format("ID", "Branch", "Commit", "Age", "Message"),
+            "-" * 100
+        ]
         
-        # Get details for each artifact
+        # Get details for each artifact, with ages relative to a single "now"
+        now = datetime.now(timezone.utc)
         for artifact in artifacts:
             workflow_run = artifact.get("workflow_run", {})
-            
+
             # Get commit details
             head_branch = workflow_run.get("head_branch", "unknown")
-            head_sha = workflow_run.get("head_sha", "")[:8]  # Short SHA
-            
+            full_sha = workflow_run.get("head_sha", "")
+            head_sha = full_sha[:8]  # Short SHA
+
             # Get commit message (first line only, truncated)
-            commit_url = f"{GITHUB_API}/repos/{REPO_OWNER}/{REPO_NAME}/commits/{head_sha}" if head_sha else ""
-            commit_msg = ""
-            if commit_url:
-                try:
-                    commit_response = requests.get(
-                        commit_url,
-                        headers=get_headers(token)
-                    )
-                    if commit_response.status_code == 200:
-                        commit_data = commit_response.json()
-                        commit_msg = commit_data.get("commit", {}).get("message", "").split('\n')[0][:50]
-                except Exception as e:
-                    commit_msg = "[Error fetching commit]"
-            
+            commit_msg = commit_msgs.get(full_sha, "")[:50]
+
             # Format relative time
             created_raw = artifact.get("created_at", "")
-            relative_time = format_relative_time(created_raw) if created_raw else "unknown"
+            relative_time = format_relative_time(created_raw, now) if created_raw else "unknown"
             
-            # Print the main line
-            print(f"{artifact['id']:<12} "
-                  f"{head_branch[:18]:<20} "
-                  f"{head_sha:<10} "
-                  f"{relative_time:<12} "
-                  f"{commit_msg}")
+            # Add the main line
+            rows.append(_ROW_FMT.format(artifact['id'], head_branch[:18], head_sha, relative_time, commit_msg))
             
-            # Print any PR info if available
+            # Add any PR info if available
             prs = workflow_run.get("pull_requests", [])
             if prs:
                 pr = prs[0]
                 pr_number = pr.get("number")
                 if pr_number:
                     pr_url = f"https://github.com/{REPO_OWNER}/{REPO_NAME}/pull/{pr_number}"
-                    print(f"{'':<12} {'PR #' + str(pr_number):<20} {'':<10} {'':<12} {pr_url}")
+                    rows.append(_ROW_FMT.format("", f"PR #{pr_number}", "", "", pr_url))
             
+        sys.stdout.write("\n".join(rows) + "\n")
         return artifacts
     except requests.exceptions.RequestException as e:
         print(f"Error fetching artifacts: {e}", file=sys.stderr)
@@ -174,88 +559,240 @@ def list_artifacts(token: Optional[str] = None, count: int = 5) -> List[Dict]:
         return []
 
 
+def _cached_artifact_path(artifact_id: int) -> Path:
+    """Path of an artifact zip in the local artifact cache."""
+    return ARTIFACT_CACHE_DIR / f"{artifact_id}.zip"
+
+
+def _write_replacing(src: BinaryIO, dst: str) -> None:
+    """
+    Copy a stream to dst through a temporary file next to it, then move that
+    into place. dst is replaced rather than truncated, so a half-written file
+    is never left under its name.
+    """
+    tmp = f"{dst}.{uuid.uuid4().hex[:8]}.part"
+    try:
+        with open(tmp, 'xb') as f:
+            shutil.copyfileobj(src, f, length=_COPY_BUF)
+        os.replace(tmp, dst)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def _evict_cached_artifacts() -> None:
+    """Remove the oldest cached artifacts beyond ARTIFACT_CACHE_SIZE."""
+    cached = sorted(ARTIFACT_CACHE_DIR.glob("*.zip"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in cached[ARTIFACT_CACHE_SIZE:]:
+        old.unlink()
+
+
+def _store_cached_artifact(artifact_id: int, src: BinaryIO) -> None:
+    """Copy a downloaded artifact into the cache, evicting the oldest beyond ARTIFACT_CACHE_SIZE."""
+    try:
+        ARTIFACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _write_replacing(src, str(_cached_artifact_path(artifact_id)))
+        _evict_cached_artifacts()
+    except OSError as e:
+        print(f"Warning: Could not cache artifact: {e}", file=sys.stderr)
+
+
 def download_artifact(artifact_id: int, token: Optional[str] = None, output_path: Optional[str] = None) -> bool:
-    """Download a specific artifact."""
+    """Download a specific artifact, reusing a locally cached copy if there is one."""
     url = f"{GITHUB_API}/repos/{REPO_OWNER}/{REPO_NAME}/actions/artifacts/{artifact_id}/zip"
     headers = get_headers(token)
     
     if not output_path:
         output_path = f"snapcast_artifact_{artifact_id}.zip"
     
+    # Create parent directories if they don't exist (a bare filename has none)
+    parent = os.path.dirname(output_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    
+    # The output and the cache are always separate copies, so overwriting
+    # one later can never change the other
+    cached_zip = _cached_artifact_path(artifact_id)
+    if cached_zip.exists():
+        with open(cached_zip, 'rb') as f:
+            _write_replacing(f, output_path)
+        print(f"Copied cached artifact {artifact_id} to {output_path}")
+        return True
+    
     try:
-        with requests.get(url, headers=headers, stream=True) as response:
+        with _gh_request("GET", url, headers=headers, stream=True) as response:
             response.raise_for_status()
             
-            # Create parent directories if they don't exist
-            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-            
-            # Save the file
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # Save the file, copying in 1 MiB blocks
+            response.raw.decode_content = True
+            _write_replacing(response.raw, output_path)
             
             print(f"Downloaded artifact {artifact_id} to {output_path}")
-            return True
+        
+        with open(output_path, 'rb') as f:
+            _store_cached_artifact(artifact_id, f)
+        return True
             
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
         print(f"Error downloading artifact: {e}", file=sys.stderr)
         if hasattr(e, 'response') and e.response is not None:
             print(f"Response: {e.response.text}", file=sys.stderr)
         return False
 
 
-def extract_zip(zip_path: str, extract_to: str = None) -> str:
-    """Extract a zip file and return the directory path."""
-    if not extract_to:
-        extract_to = tempfile.mkdtemp(prefix="artifact_")
+def _find_raucb_member(zf: zipfile.ZipFile) -> zipfile.ZipInfo:
+    """Find the rootfs.raucb entry of an artifact zip."""
+    for info in zf.infolist():
+        if info.filename == 'rootfs.raucb' or info.filename.endswith('/rootfs.raucb'):
+            return info
+    raise FileNotFoundError("rootfs.raucb not found in the artifact")
+
+
+@contextlib.contextmanager
+def _open_zip_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, max_in_memory: int = RAUCB_IN_MEMORY_MAX) -> Iterator[BinaryIO]:
+    """
+    Open a zip member as a seekable binary stream. Members of up to
+    max_in_memory bytes are inflated into memory once, larger ones are
+    inflated on the fly (and again after a rewind).
+    """
+    if info.file_size <= max_in_memory:
+        yield io.BytesIO(zf.read(info))
+    else:
+        with zf.open(info) as stream:
+            yield stream
+
+
+@contextlib.contextmanager
+def open_raucb(zip_file, max_in_memory: int = RAUCB_IN_MEMORY_MAX) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Open the rootfs.raucb member of an artifact zip without extracting it to
+    disk. Yields the bundle's file name and a seekable stream of its contents
+    (see _open_zip_member).
+    """
+    with zipfile.ZipFile(zip_file) as zf:
+        info = _find_raucb_member(zf)
+        with _open_zip_member(zf, info, max_in_memory) as stream:
+            yield os.path.basename(info.filename), stream
+
+
+@contextlib.contextmanager
+def _open_artifact_zip(artifact_id: int, token: Optional[str]) -> Iterator[Optional[Union[str, BinaryIO]]]:
+    """
+    Get an artifact zip for reading, from the local cache or by downloading it.
+    A download is written straight into the cache, so deploying the same
+    artifact again needs no download. If the cache directory can't be
+    created, it goes to an anonymous temporary file instead. Yields a path or
+    file object to open with zipfile, or None if the download failed.
+    """
+    url = f"{GITHUB_API}/repos/{REPO_OWNER}/{REPO_NAME}/actions/artifacts/{artifact_id}/zip"
     
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to)
+    cached_zip = _cached_artifact_path(artifact_id)
+    if cached_zip.exists():
+        yield str(cached_zip)
+        return
     
-    return extract_to
+    try:
+        ARTIFACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cacheable = True
+    except OSError as e:
+        print(f"Warning: Could not cache artifact: {e}", file=sys.stderr)
+        cacheable = False
+    
+    with contextlib.ExitStack() as stack:
+        try:
+            with _gh_request("GET", url, headers=get_headers(token), stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                if cacheable:
+                    _write_replacing(response.raw, str(cached_zip))
+                    zip_file = str(cached_zip)
+                else:
+                    zip_file = stack.enter_context(tempfile.TemporaryFile())
+                    shutil.copyfileobj(response.raw, zip_file, length=_COPY_BUF)
+                    zip_file.seek(0)
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+            print(f"Error downloading artifact: {e}", file=sys.stderr)
+            if hasattr(e, 'response') and e.response is not None:
+                print(f"Response: {e.response.text}", file=sys.stderr)
+            yield None
+            return
+        
+        if cacheable:
+            _evict_cached_artifacts()
+        yield zip_file
 
 
-def find_raucb_file(directory: str) -> str:
-    """Find the rootfs.raucb file in the directory."""
-    for root, _, files in os.walk(directory):
-        if 'rootfs.raucb' in files:
-            return os.path.join(root, 'rootfs.raucb')
-    raise FileNotFoundError("rootfs.raucb not found in the artifact")
+@contextlib.contextmanager
+def _open_artifact_raucb(artifact_id: int, token: Optional[str]) -> Iterator[Optional[Tuple[str, BinaryIO]]]:
+    """Get an artifact and open only its rootfs.raucb, see open_raucb. Yields None if the download failed."""
+    with _open_artifact_zip(artifact_id, token) as zip_file:
+        if zip_file is None:
+            yield None
+            return
+        with open_raucb(zip_file) as raucb:
+            yield raucb
 
 
-def get_all_targets(base_url: str, username: str, password: str, verbose: bool = False) -> List[Dict]:
-    """Get all targets from Hawkbit server."""
-    targets_url = f"{base_url}/rest/v1/targets"
-    try:
-        response = requests.get(
-            targets_url,
+def _paginate(url: str, username: str, password: str, params: Optional[Dict] = None, page_size: int = 500) -> Iterator[Dict]:
+    """
+    Yield the items of a paged Hawkbit list endpoint, fetching one page at a time.
+    The management API pages by offset/limit and sends no Link headers, so a
+    short page marks the end.
+    """
+    offset = 0
+    while True:
+        response = _hb_session.get(
+            url,
             auth=(username, password),
-            headers={"Accept": "application/json"},
-            params={"limit": 1000}  # Adjust limit as needed
+            headers=_ACCEPT_JSON,
+            params={**(params or {}), "offset": offset, "limit": page_size}
         )
         response.raise_for_status()
-        return response.json().get("content", [])
+        content = _loads(response.content).get("content", [])
+        yield from content
+        if len(content) < page_size:
+            break
+        offset += page_size
+
+
+def iter_targets(base_url: str, username: str, password: str, page_size: int = 500) -> Iterator[Dict]:
+    """Yield all targets from Hawkbit server, fetching one page at a time."""
+    return _paginate(f"{base_url}/rest/v1/targets", username, password, page_size=page_size)
+
+
+def get_all_targets(base_url: str, username: str, password: str, verbose: bool = False) -> List[Dict]:
+    """Get all targets from Hawkbit server."""
+    try:
+        return list(iter_targets(base_url, username, password))
     except requests.exceptions.RequestException as e:
         print(f"Error getting targets: {e}", file=sys.stderr)
         return []
 
 
-def get_target_status(base_url: str, target_id: str, username: str, password: str, verbose: bool = False) -> Dict:
-    """Get detailed status for a specific target including current and requested versions."""
+def get_target_status(base_url: str, target_id: str, username: str, password: str, verbose: bool = False, target: Optional[Dict] = None) -> Dict:
+    """
+    Get detailed status for a specific target including current and requested versions.
+    Pass the target's entry from the targets list as `target` to skip fetching it again.
+    """
     target_url = f"{base_url}/rest/v1/targets/{target_id}"
     try:
-        response = requests.get(
-            target_url,
-            auth=(username, password),
-            headers={"Accept": "application/json"}
-        )
-        response.raise_for_status()
-        target_data = response.json()
+        if target is not None:
+            target_data = target
+        else:
+            response = _hb_session.get(
+                target_url,
+                auth=(username, password),
+                headers=_ACCEPT_JSON
+            )
+            response.raise_for_status()
+            target_data = _loads(response.content)
         
         # Debug: Print raw response if verbose
         if verbose:
-            print(f"\nDebug - Raw API response for {target_id}:")
-            print(json.dumps(target_data, indent=2))
+            with _print_lock:
+                print(f"\nDebug - Raw API response for {target_id}:")
+                print(_dumps(target_data, pretty=True).decode())
         
         # Extract version information
         status = {
@@ -269,46 +806,46 @@ def get_target_status(base_url: str, target_id: str, username: str, password: st
             "assignedDistribution": "N/A"
         }
         
-        # Get installed (current) distribution by following the installedDS link
-        links = target_data.get("_links", {})
-        installed_ds_link = links.get("installedDS", {}).get("href")
-        if installed_ds_link:
-            try:
-                installed_response = requests.get(
-                    installed_ds_link,
-                    auth=(username, password),
-                    headers={"Accept": "application/json"}
-                )
-                if installed_response.status_code == 200:
-                    installed_ds = installed_response.json()
-                    if verbose:
-                        print(f"\nDebug - Installed DS response:")
-                        print(json.dumps(installed_ds, indent=2))
-                    status["installedDistribution"] = installed_ds.get("name", "N/A")
-                    status["installedVersion"] = installed_ds.get("version", "N/A")
-            except requests.exceptions.RequestException as e:
+        # Get installed (current) distribution. The list entries carry no links to
+        # it, but the sub-resource URL is fixed, so request it directly.
+        installed_ds_url = f"{target_url}/installedDS"
+        try:
+            installed_response = _hb_session.get(
+                installed_ds_url,
+                auth=(username, password),
+                headers=_ACCEPT_JSON
+            )
+            if installed_response.status_code == 200:
+                installed_ds = _loads(installed_response.content)
                 if verbose:
-                    print(f"Warning: Could not get installed DS: {e}")
+                    with _print_lock:
+                        print(f"\nDebug - Installed DS response for {target_id}:")
+                        print(_dumps(installed_ds, pretty=True).decode())
+                status["installedDistribution"] = installed_ds.get("name", "N/A")
+                status["installedVersion"] = installed_ds.get("version", "N/A")
+        except requests.exceptions.RequestException as e:
+            if verbose:
+                print(f"Warning: Could not get installed DS: {e}")
         
-        # Get assigned (requested) distribution by following the assignedDS link
-        assigned_ds_link = links.get("assignedDS", {}).get("href")
-        if assigned_ds_link:
-            try:
-                assigned_response = requests.get(
-                    assigned_ds_link,
-                    auth=(username, password),
-                    headers={"Accept": "application/json"}
-                )
-                if assigned_response.status_code == 200:
-                    assigned_ds = assigned_response.json()
-                    if verbose:
-                        print(f"\nDebug - Assigned DS response:")
-                        print(json.dumps(assigned_ds, indent=2))
-                    status["assignedDistribution"] = assigned_ds.get("name", "N/A")
-                    status["assignedVersion"] = assigned_ds.get("version", "N/A")
-            except requests.exceptions.RequestException as e:
+        # Get assigned (requested) distribution (204 No Content if there is none)
+        assigned_ds_url = f"{target_url}/assignedDS"
+        try:
+            assigned_response = _hb_session.get(
+                assigned_ds_url,
+                auth=(username, password),
+                headers=_ACCEPT_JSON
+            )
+            if assigned_response.status_code == 200:
+                assigned_ds = _loads(assigned_response.content)
                 if verbose:
-                    print(f"Warning: Could not get assigned DS: {e}")
+                    with _print_lock:
+                        print(f"\nDebug - Assigned DS response for {target_id}:")
+                        print(_dumps(assigned_ds, pretty=True).decode())
+                status["assignedDistribution"] = assigned_ds.get("name", "N/A")
+                status["assignedVersion"] = assigned_ds.get("version", "N/A")
+        except requests.exceptions.RequestException as e:
+            if verbose:
+                print(f"Warning: Could not get assigned DS: {e}")
         
         return status
         
@@ -334,25 +871,25 @@ def show_all_targets_status(base_url: str, username: str, password: str, verbose
         print("No targets found or error occurred.", file=sys.stderr)
         return False
     
-    print(f"\nFound {len(targets)} target(s):\n")
+    # Build the whole table and write it out in one go
+    rows = [
+        f"\nFound {len(targets)} target(s):\n",
+        _STATUS_ROW_FMT.format("Target ID", "Status", "Current Ver", "Requested Ver", "Distribution"),
+        "-" * 110
+    ]
     
-    # Print header
-    print(f"{'Target ID':<25} {'Status':<15} {'Current Ver':<15} {'Requested Ver':<15} {'Distribution'}")
-    print("-" * 110)
+    # Get detailed status for each target. The lookups are independent, so
+    # fan them out over the pooled session and print in the original order.
+    # The list entries already hold each target's own fields, so only the
+    # installed and assigned distributions are fetched per target.
+    with ThreadPoolExecutor(max_workers=min(8, len(targets))) as executor:
+        statuses = list(executor.map(
+            lambda target: get_target_status(base_url, target["controllerId"], username, password, verbose=verbose, target=target),
+            targets
+        ))
     
-    # Get detailed status for each target
-    for target in targets:
+    for target, status in zip(targets, statuses):
         target_id = target["controllerId"]
-        status = get_target_status(base_url, target_id, username, password, verbose=verbose)
-        
-        # Determine if versions match
-        version_match = ""
-        if status["installedVersion"] != "N/A" and status["assignedVersion"] != "N/A":
-            if status["installedVersion"] == status["assignedVersion"]:
-                version_match = "✓"
-            else:
-                version_match = "↑"  # Update pending
-        
         # Format the output
         update_status = status["updateStatus"]
         current_ver = status["installedVersion"]
@@ -363,30 +900,40 @@ def show_all_targets_status(base_url: str, username: str, password: str, verbose
         if len(dist_name) > 30:
             dist_name = dist_name[:27] + "..."
         
-        print(f"{target_id:<25} {update_status:<15} {current_ver:<15} {requested_ver:<15} {dist_name}")
+        rows.append(_STATUS_ROW_FMT.format(target_id, update_status, current_ver, requested_ver, dist_name))
         
         # Show additional details if verbose
         if verbose:
-            print(f"  Name: {status['name']}")
-            print(f"  Description: {status['description']}")
+            rows.append(f"  Name: {status['name']}")
+            rows.append(f"  Description: {status['description']}")
             if status["assignedDistribution"] != "N/A" and status["assignedDistribution"] != status["installedDistribution"]:
-                print(f"  Assigned Distribution: {status['assignedDistribution']}")
+                rows.append(f"  Assigned Distribution: {status['assignedDistribution']}")
     
-    print()
+    sys.stdout.write("\n".join(rows) + "\n\n")
     return True
 
 
-def assign_distribution_to_targets(base_url: str, dist_id: int, username: str, password: str, verbose: bool = False) -> bool:
-    """Assign a distribution set to all targets."""
-    targets = get_all_targets(base_url, username, password, verbose=verbose)
-    if not targets:
-        print("No targets found to assign distribution to", file=sys.stderr)
-        return False
-    
-    success_count = 0
+def _targets_with_dist(base_url: str, dist_id: int, username: str, password: str, verbose: bool = False) -> Set[str]:
+    """Get the controller IDs of all targets that already have a distribution set assigned."""
+    assigned_url = f"{base_url}/rest/v1/distributionsets/{dist_id}/assignedTargets"
+    try:
+        return {t["controllerId"] for t in _paginate(assigned_url, username, password)}
+    except requests.exceptions.RequestException as e:
+        # Not fatal: assigning again is harmless, just slower
+        vprint(verbose, f"Warning: Could not get assigned targets of distribution {dist_id}: {e}")
+        return set()
+
+
+def _assign_each_target(base_url: str, dist_id: int, username: str, password: str, targets: List[Dict], verbose: bool = False) -> bool:
+    """Assign a distribution set to targets with one request per target."""
+    # Only POST to targets that don't have this distribution assigned yet
+    already_assigned = _targets_with_dist(base_url, dist_id, username, password, verbose=verbose)
+    pending = [t for t in targets if t["controllerId"] not in already_assigned]
+    if not pending:
+        vprint(verbose, f"Distribution {dist_id} is already assigned to all {len(targets)} targets")
+        return True
     
-    for target in targets:
-        target_id = target["controllerId"]
+    def _assign_one(target_id: str) -> Tuple[str, bool]:
         assign_url = f"{base_url}/rest/v1/targets/{target_id}/assignedDS"
         
         assign_data = {
@@ -395,108 +942,151 @@ def assign_distribution_to_targets(base_url: str, dist_id: int, username: str, p
         
         try:
             vprint(verbose, f"Assigning distribution {dist_id} to target {target_id}")
-            response = requests.post(
+            response = _hb_session.post(
                 assign_url,
                 auth=(username, password),
-                json=assign_data,
-                headers={
-                    "Content-Type": "application/json",
-                    "Accept": "application/hal+json"
-                }
+                data=_dumps(assign_data),
+                headers=_HAL_HEADERS
             )
             
             if response.status_code in (200, 201):
-                success_count += 1
-            else:
-                print(f"Failed to assign to {target_id}: {response.status_code} - {response.text}")
+                return target_id, True
+            print(f"Failed to assign to {target_id}: {response.status_code} - {response.text}")
                 
         except requests.exceptions.RequestException as e:
             print(f"Error assigning to {target_id}: {e}")
+        return target_id, False
+    
+    # Assignments are independent, so fan them out over the pooled session
+    with ThreadPoolExecutor(max_workers=min(16, len(pending))) as executor:
+        results = list(executor.map(_assign_one, [t["controllerId"] for t in pending]))
+    success_count = sum(1 for _, ok in results if ok)
     
     if success_count == 0:
         print("Failed to assign distribution to any targets", file=sys.stderr)
         return False
         
     if verbose or success_count == 0:
-        print(f"Successfully assigned distribution to {success_count} out of {len(targets)} targets")
+        print(f"Successfully assigned distribution to {success_count} out of {len(pending)} targets "
+              f"({len(targets) - len(pending)} already assigned)")
     return True
 
 
+def assign_distribution_to_targets(base_url: str, dist_id: int, username: str, password: str, verbose: bool = False, targets: Optional[List[Dict]] = None) -> bool:
+    """Assign a distribution set to all targets (fetched if not given)."""
+    if targets is None:
+        targets = get_all_targets(base_url, username, password, verbose=verbose)
+    if not targets:
+        print("No targets found to assign distribution to", file=sys.stderr)
+        return False
+    
+    # Assign every target in a single request; the server skips targets that
+    # already have this distribution
+    try:
+        response = _hb_session.post(
+            f"{base_url}/rest/v1/distributionsets/{dist_id}/assignedTargets",
+            auth=(username, password),
+            data=_dumps([{"id": t["controllerId"]} for t in targets]),
+            headers=_HAL_HEADERS
+        )
+        # Servers without the endpoint answer 404 (no such route) or 405
+        if response.status_code not in (404, 405):
+            response.raise_for_status()
+            summary = _loads(response.content)
+            vprint(verbose, f"Successfully assigned distribution to {summary.get('assigned', 0)} out of {len(targets)} targets "
+                            f"({summary.get('alreadyAssigned', 0)} already assigned)")
+            return True
+    except requests.exceptions.RequestException as e:
+        print(f"Error assigning distribution {dist_id} to targets: {e}", file=sys.stderr)
+        if hasattr(e, 'response') and e.response is not None:
+            print(f"Response body: {e.response.text}", file=sys.stderr)
+        return False
+    
+    # Servers without the bulk endpoint: fall back to one POST per target
+    vprint(verbose, "Bulk assignment not supported by the server, assigning targets one by one")
+    return _assign_each_target(base_url, dist_id, username, password, targets, verbose=verbose)
+
+
+def _parse_version(version: Optional[str]) -> Optional[Tuple[int, ...]]:
+    """
+    Parse a dotted version string into a tuple of integers, or None if it
+    isn't one. Tuples compare numerically per component, so 1.10 > 1.9.
+    """
+    try:
+        return tuple(int(part) for part in str(version).split('.'))
+    except ValueError:
+        return None
+
+
+def _next_version(version: Tuple[int, ...]) -> str:
+    """Version to use after the given one: the next major version."""
+    return f"{version[0] + 1}.0"
+
+
+def _latest_distribution(base_url: str, name: str, username: str, password: str, verbose: bool = False) -> tuple[Optional[int], str]:
+    """Query Hawkbit for the newest distribution with the given name, see find_existing_distribution."""
+    list_url = f"{base_url}/rest/v1/distributionsets"
+    
+    # Ask the server for only the newest distribution with this name. This
+    # tool always creates increasing versions, so it normally holds the latest.
+    all_ds = None
+    try:
+        latest_response = _hb_session.get(
+            list_url,
+            auth=(username, password),
+            params={"limit": 1, "q": f"name=={name}", "sort": "id:DESC"},
+            headers=_ACCEPT_JSON
+        )
+        latest_response.raise_for_status()
+        all_ds = _loads(latest_response.content).get("content", [])
+    except requests.exceptions.HTTPError as e:
+        # Older servers may reject the sort parameter; scan everything instead
+        if e.response is None or e.response.status_code != 400:
+            raise
+        vprint(verbose, f"Sorted distribution query rejected, scanning all versions of {name}")
+    
+    if all_ds and _parse_version(all_ds[0].get("version")) is None:
+        # Newest set has a non-numeric version, fall back to a full scan
+        all_ds = None
+    
+    if all_ds is None:
+        # Get all distributions with the same name
+        all_ds = list(_paginate(list_url, username, password, params={"q": f"name=={name}"}))
+    
+    if not all_ds:
+        return None, "1.0"
+    
+    # Track the distribution with the highest numeric version in one pass
+    latest_ds = None
+    latest_version = None
+    
+    for ds in all_ds:
+        version = _parse_version(ds.get("version"))
+        if version is not None and (latest_version is None or version > latest_version):
+            latest_version = version
+            latest_ds = ds
+    
+    # Return the latest distribution ID (if any) and the next version
+    if latest_ds is None:
+        return None, "1.0"
+    return latest_ds["id"], _next_version(latest_version)
+
+
 def find_existing_distribution(base_url: str, name: str, username: str, password: str, verbose: bool = False) -> tuple[Optional[int], str]:
     """
     Find an existing distribution by name and return its ID and the next available version number.
     Handles version conflicts by finding the next available version number.
+    Successful lookups are remembered for the rest of the run.
     """
+    key = (base_url, name)
+    with _distribution_lock:
+        cached = _distribution_cache.get(key)
+    if cached is not None:
+        vprint(verbose, f"Using cached lookup of distribution {name}")
+        return cached
+    
     try:
-        # First, get all distributions with the same name
-        all_ds = []
-        page = 0
-        page_size = 50
-        
-        while True:
-            # First, get the list of distribution sets with the given name
-            list_url = f"{base_url}/rest/v1/distributionsets"
-            list_params = {
-                "limit": page_size,
-                "offset": page * page_size,
-                "q": f"name=={name}"
-            }
-            
-            list_response = requests.get(
-                list_url,
-                auth=(username, password),
-                params=list_params,
-                headers={"Accept": "application/json"}
-            )
-            list_response.raise_for_status()
-            
-            content = list_response.json()
-            if not content.get("content"):
-                break
-                
-            all_ds.extend(content["content"])
-            
-            # Check if there are more pages
-            if (page + 1) * page_size >= content.get("totalElements", 0):
-                break
-            page += 1
-        
-        if not all_ds:
-            return None, "1.0"
-        
-        # Extract and parse versions
-        versions = []
-        latest_ds = None
-        latest_version = 0.0
-        
-        for ds in all_ds:
-            try:
-                version_str = ds.get("version", "0.0")
-                # Handle both string and numeric versions
-                version = float(version_str) if str(version_str).replace('.', '').isdigit() else 0.0
-                versions.append(version)
-                
-                # Track the distribution with the highest version
-                if version > latest_version:
-                    latest_version = version
-                    latest_ds = ds
-            except (ValueError, AttributeError):
-                continue
-        
-        if not versions:  # No valid versions found
-            return None, "1.0"
-        
-        # Find the next available version
-        versions_sorted = sorted(versions, reverse=True)
-        next_version = versions_sorted[0] + 1.0
-        
-        # Check if the next version already exists (just in case)
-        while next_version in versions:
-            next_version += 1.0
-        
-        # Return the latest distribution ID (if any) and the next version
-        return (latest_ds["id"], f"{next_version:.1f}") if latest_ds else (None, f"{next_version:.1f}")
-        
+        result = _latest_distribution(base_url, name, username, password, verbose=verbose)
     except requests.exceptions.RequestException as e:
         print(f"Error searching for distributions: {e}", file=sys.stderr)
         if hasattr(e, 'response') and e.response is not None:
@@ -506,37 +1096,104 @@ def find_existing_distribution(base_url: str, name: str, username: str, password
     except Exception as e:
         print(f"Unexpected error finding distributions: {e}", file=sys.stderr)
         return None, "1.0"
+    
+    with _distribution_lock:
+        _distribution_cache[key] = result
+    return result
+
+
+def check_hawkbit_ready(base_url: str, username: str, password: str, distribution_name: Optional[str] = None, verbose: bool = False) -> bool:
+    """
+    Make sure Hawkbit is reachable and accepts the credentials before spending
+    time on an artifact download. With a distribution_name the check is the
+    lookup of that distribution, which also primes the lookup cache for the
+    deployment that follows. Without one, a single distribution set is listed.
+    """
+    try:
+        if distribution_name is None:
+            response = _hb_session.get(
+                f"{base_url}/rest/v1/distributionsets",
+                auth=(username, password),
+                params={"limit": 1},
+                headers=_ACCEPT_JSON
+            )
+            response.raise_for_status()
+        else:
+            result = _latest_distribution(base_url, distribution_name, username, password, verbose=verbose)
+            with _distribution_lock:
+                _distribution_cache[(base_url, distribution_name)] = result
+    except requests.exceptions.RequestException as e:
+        print(f"Error: Hawkbit server at {base_url} is not ready: {e}", file=sys.stderr)
+        if hasattr(e, 'response') and e.response is not None and e.response.status_code in (401, 403):
+            print("Check the Hawkbit username and password", file=sys.stderr)
+        return False
+    
+    vprint(verbose, f"Hawkbit server at {base_url} is ready")
+    return True
+
+
+def _find_distribution_id(base_url: str, name: str, version: str, username: str, password: str) -> Optional[int]:
+    """Get the ID of the distribution set with the given name and version, or None if there is none."""
+    response = _hb_session.get(
+        f"{base_url}/rest/v1/distributionsets",
+        auth=(username, password),
+        params={"limit": 1, "q": f"name=={name};version=={version}"},
+        headers=_ACCEPT_JSON
+    )
+    response.raise_for_status()
+    content = _loads(response.content).get("content")
+    return content[0].get("id") if content else None
 
 
-def create_or_update_distribution(base_url: str, name: str, module_id: int, username: str, password: str, assign_to_all: bool = True, verbose: bool = False) -> bool:
-    """Create or update a distribution set in Hawkbit and assign the software module to it."""
+def distribution_exists(base_url: str, name: str, version: str, username: str, password: str) -> bool:
+    """Check whether a distribution set with the given name and version exists."""
+    return _find_distribution_id(base_url, name, version, username, password) is not None
+
+
+def _distribution_has_module(base_url: str, dist_id: int, module_id: int, username: str, password: str) -> bool:
+    """Check whether a software module is assigned to a distribution set."""
+    response = _hb_session.get(
+        f"{base_url}/rest/v1/distributionsets/{dist_id}/assignedModules",
+        auth=(username, password),
+        headers=_ACCEPT_JSON
+    )
+    response.raise_for_status()
+    return any(module.get("id") == module_id for module in _loads(response.content))
+
+
+def create_or_update_distribution(base_url: str, name: str, module_id: int, username: str, password: str, assign_to_all: bool = True, verbose: bool = False, targets: Optional[List[Dict]] = None, version: Optional[str] = None) -> bool:
+    """
+    Create or update a distribution set in Hawkbit and assign the software module to it.
+    With an explicit version the set is created straight away, skipping the lookup of
+    existing versions. If that version already exists it is reused when it holds the
+    module, and it is an error otherwise; another version is never picked instead.
+    A numeric explicit version gets a "v" prefix (e.g. v1234), so the set isn't
+    mistaken for part of the automatic 1.0, 2.0, ... series.
+    """
     dist_url = f"{base_url}/rest/v1/distributionsets"
     
-    # First try to find an existing distribution with the same name and get next version
-    existing_dist_id, next_version = find_existing_distribution(base_url, name, username, password, verbose=verbose)
+    if version is not None and _parse_version(version) is not None:
+        version = f"v{version}"
+    
+    if version is None:
+        # First try to find an existing distribution with the same name and get next version
+        existing_dist_id, next_version = find_existing_distribution(base_url, name, username, password, verbose=verbose)
+    else:
+        existing_dist_id, next_version = None, version
     
     if existing_dist_id:
         vprint(verbose, f"Found existing distribution with ID: {existing_dist_id}, checking modules...")
         
-        # Get existing modules
         try:
-            response = requests.get(
-                f"{dist_url}/{existing_dist_id}/assignedModules",
-                auth=(username, password),
-                headers={"Accept": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                # If the module is already assigned, we're done
-                modules = response.json()
-                if any(module.get("id") == module_id for module in modules):
-                    vprint(verbose, f"Module {module_id} is already assigned to distribution {existing_dist_id}")
-                    
-                    # Assign to all targets if requested
-                    if assign_to_all and not assign_distribution_to_targets(base_url, existing_dist_id, username, password, verbose=verbose):
-                        print("Warning: Failed to assign distribution to all targets", file=sys.stderr)
-                        return False
-                    return True
+            # If the module is already assigned, we're done
+            if _distribution_has_module(base_url, existing_dist_id, module_id, username, password):
+                vprint(verbose, f"Module {module_id} is already assigned to distribution {existing_dist_id}")
+                
+                # Assign to all targets if requested
+                if assign_to_all and not assign_distribution_to_targets(base_url, existing_dist_id, username, password, verbose=verbose, targets=targets):
+                    print("Warning: Failed to assign distribution to all targets", file=sys.stderr)
+                    return False
+                return True
             
             # If we get here, we need to create a new version with the updated module
             vprint(verbose, f"Creating new version {next_version} of distribution {name}")
@@ -545,68 +1202,72 @@ def create_or_update_distribution(base_url: str, name: str, module_id: int, user
             print(f"Error checking existing distribution modules: {e}", file=sys.stderr)
             # Continue with creating a new version
     
-    # Create a new distribution with the next version number
-    dist_data = [{
-        "name": name,
-        "version": next_version,
-        "description": f"Snapcast Client Deployment - {name} (v{next_version})",
-        "type": "os",
-        "modules": [{"id": module_id}],
-        "requiredMigrationStep": False
-    }]
-    
     try:
-        vprint(verbose, f"Creating distribution set with data: {json.dumps(dist_data, indent=2)}")
+        # Make sure the version is free before POSTing instead of reacting to a 409
+        if version is None:
+            while distribution_exists(base_url, name, next_version, username, password):
+                next_version = _next_version(_parse_version(next_version))
+                vprint(verbose, f"Distribution version already exists, using version: {next_version}")
+        
+        # Create a new distribution with the next version number
+        dist_data = [{
+            "name": name,
+            "version": next_version,
+            "description": f"Snapcast Client Deployment - {name} (v{next_version})",
+            "type": "os",
+            "modules": [{"id": module_id}],
+            "requiredMigrationStep": False
+        }]
+        
+        # Only serialize the request and decode the response for display when verbose
+        vprint(verbose, lambda: f"Creating distribution set with data: {_dumps(dist_data, pretty=True).decode()}")
         
-        response = requests.post(
+        response = _hb_session.post(
             dist_url,
             auth=(username, password),
-            json=dist_data,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
+            data=_dumps(dist_data),
+            headers=_JSON_HEADERS
         )
         
-        # If we get a conflict, try with the next version number
-        if response.status_code == 409:
-            # Extract current version and increment
-            current_version = float(dist_data[0]["version"])
-            next_version = f"{current_version + 1:.1f}"
-            dist_data[0]["version"] = next_version
-            dist_data[0]["description"] = f"Snapcast Client Deployment - {name} (v{next_version})"
-            vprint(verbose, f"Distribution conflict, retrying with version: {next_version}")
-            
-            response = requests.post(
-                dist_url,
-                auth=(username, password),
-                json=dist_data,
-                headers={
-                    "Content-Type": "application/json",
-                    "Accept": "application/json"
-                }
-            )
-        
-        vprint(verbose, f"Distribution creation response: {response.status_code}")
-        vprint(verbose, f"Response body: {response.text}")
-        
-        response.raise_for_status()
+        if verbose:
+            print(f"Distribution creation response: {response.status_code}")
+            print(f"Response body: {response.text}")
         
-        created_dists = response.json()
-        if not isinstance(created_dists, list) or not created_dists:
-            print("Error: Unexpected response format for distribution creation", file=sys.stderr)
-            return False
+        if version is not None and response.status_code == 409:
+            # The version was asked for explicitly, so only reuse the existing
+            # set if it is this same bundle; never pick another version instead
+            dist_id = _find_distribution_id(base_url, name, version, username, password)
+            if dist_id is None or not _distribution_has_module(base_url, dist_id, module_id, username, password):
+                print(f"Error: Distribution {name} version {version} already exists with a different bundle",
+                      file=sys.stderr)
+                return False
+            print(f"Distribution {name} version {version} already holds this bundle, reusing it")
+        else:
+            response.raise_for_status()
             
-        dist_id = created_dists[0].get("id")
-        if not dist_id:
-            print("Error: Could not get distribution ID from response", file=sys.stderr)
-            return False
+            created_dists = _loads(response.content)
+            if not isinstance(created_dists, list) or not created_dists:
+                print("Error: Unexpected response format for distribution creation", file=sys.stderr)
+                return False
+                
+            dist_id = created_dists[0].get("id")
+            if not dist_id:
+                print("Error: Could not get distribution ID from response", file=sys.stderr)
+                return False
+                
+            vprint(verbose, f"Created distribution set with ID: {dist_id}")
             
-        vprint(verbose, f"Created distribution set with ID: {dist_id}")
+            # Keep the lookup cache in step with the set just created. An explicit
+            # version need not be the newest, so drop the entry in that case.
+            with _distribution_lock:
+                if version is None:
+                    _distribution_cache[(base_url, name)] = (dist_id, _next_version(_parse_version(next_version)))
+                else:
+                    _distribution_cache.pop((base_url, name), None)
         
         # Assign to all targets if requested
         if assign_to_all:
-            if not assign_distribution_to_targets(base_url, dist_id, username, password, verbose=verbose):
+            if not assign_distribution_to_targets(base_url, dist_id, username, password, verbose=verbose, targets=targets):
                 print("Warning: Failed to assign distribution to all targets", file=sys.stderr)
                 return False
                 
@@ -620,19 +1281,105 @@ def create_or_update_distribution(base_url: str, name: str, module_id: int, user
         return False
 
 
-def upload_to_hawkbit(raucb_path: str, base_url: str, username: str, password: str, distribution_name: str, assign_to_all: bool = True, verbose: bool = False) -> bool:
-    """Upload a file to Hawkbit server and create a distribution set."""
-    # First, create a software module
-    module_url = f"{base_url}/rest/v1/softwaremodules"
+class _MultipartFileStream:
+    """
+    Streaming multipart/form-data body with a single file field, used when
+    requests-toolbelt isn't installed. The file is read lazily as the request
+    is sent, and the total length is known up front so requests sends a
+    Content-Length rather than buffering the body.
+    """
+    
+    def __init__(self, field: str, filename: str, fileobj, size: int, content_type: str = 'application/octet-stream'):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+        tail = f'\r\n--{boundary}--\r\n'.encode()
+        self._parts = [io.BytesIO(head), fileobj, io.BytesIO(tail)]
+        self._length = len(head) + size + len(tail)
+    
+    def __len__(self) -> int:
+        return self._length
     
-    # Create a unique name based on the current timestamp
-    import time
-    timestamp = int(time.time())
-    module_name = f"snapcast_{timestamp}"
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(part.read() for part in self._parts)
+        chunks = []
+        while size > 0 and self._parts:
+            data = self._parts[0].read(size)
+            if not data:
+                self._parts.pop(0)
+                continue
+            chunks.append(data)
+            size -= len(data)
+        return b"".join(chunks)
+
+
+def file_sha256(path: str) -> str:
+    """Compute the SHA-256 hex digest of a file, reading it in 1 MiB blocks."""
+    with open(path, 'rb') as f:
+        return _stream_sha256(f)[0]
+
+
+def _stream_sha256(f: BinaryIO) -> Tuple[str, int]:
+    """Compute the SHA-256 hex digest and length of the rest of an open binary file."""
+    digest = hashlib.sha256()
+    size = 0
+    for block in iter(lambda: f.read(_COPY_BUF), b''):
+        digest.update(block)
+        size += len(block)
+    return digest.hexdigest(), size
+
+
+def find_software_module(base_url: str, name: str, username: str, password: str) -> Tuple[Optional[int], bool]:
+    """
+    Look up a software module by name.
+    Returns its ID (or None if it doesn't exist) and whether it already has
+    an uploaded artifact, so an interrupted earlier upload is retried.
+    """
+    response = _hb_session.get(
+        f"{base_url}/rest/v1/softwaremodules",
+        auth=(username, password),
+        params={"limit": 1, "q": f"name=={name}"},
+        headers=_ACCEPT_JSON
+    )
+    response.raise_for_status()
+    modules = _loads(response.content).get("content", [])
+    if not modules:
+        return None, False
+    
+    module_id = modules[0]["id"]
+    artifacts_response = _hb_session.get(
+        f"{base_url}/rest/v1/softwaremodules/{module_id}/artifacts",
+        auth=(username, password),
+        headers=_ACCEPT_JSON
+    )
+    artifacts_response.raise_for_status()
+    return module_id, bool(_loads(artifacts_response.content))
+
+
+def upload_to_hawkbit(raucb_path: str, base_url: str, username: str, password: str, distribution_name: str, assign_to_all: bool = True, verbose: bool = False, dist_version: Optional[str] = None, targets: Optional[List[Dict]] = None, raucb_data: Optional[BinaryIO] = None) -> bool:
+    """
+    Upload a file to Hawkbit server and create a distribution set.
+    The software module is named after the bundle's SHA-256, so deploying the
+    same bundle again reuses the module and skips the upload.
+    If raucb_data (a seekable binary stream, e.g. from open_raucb) is given,
+    the bundle is read from it and raucb_path only names the uploaded file.
+    Pass targets if the caller already has them (deploy lists them while the
+    artifact downloads); otherwise they are fetched when assigning.
+    """
+    module_url = f"{base_url}/rest/v1/softwaremodules"
     
-    # Set verbose flag for nested function calls
-    global vprint_verbose
-    vprint_verbose = verbose
+    # Name the module after the bundle contents so retries are idempotent
+    if raucb_data is not None:
+        raucb_data.seek(0)
+        digest, raucb_size = _stream_sha256(raucb_data)
+    else:
+        digest, raucb_size = file_sha256(raucb_path), os.path.getsize(raucb_path)
+    module_name = f"snapcast_{digest[:16]}"
     
     module_data = [{
         "name": module_name,
@@ -642,62 +1389,79 @@ def upload_to_hawkbit(raucb_path: str, base_url: str, username: str, password: s
     }]
     
     try:
-        # Debug: Print the request we're about to make
-        vprint(verbose, f"Creating software module with data: {json.dumps(module_data, indent=2)}")
-        
-        # Create software module
-        response = requests.post(
-            module_url,
-            auth=(username, password),
-            json=module_data,
-            headers={
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-        )
-        
-        vprint(verbose, f"Response status: {response.status_code}")
-        vprint(verbose, f"Response body: {response.text}")
+        module_id, has_artifacts = find_software_module(base_url, module_name, username, password)
         
-        response.raise_for_status()
-        
-        # The response should be an array of created modules
-        created_modules = response.json()
-        if not isinstance(created_modules, list) or not created_modules:
-            print("Error: Unexpected response format from server", file=sys.stderr)
-            return False
-            
-        module_id = created_modules[0].get("id")
-        if not module_id:
-            print("Error: Could not get module ID from response", file=sys.stderr)
-            return False
+        if module_id:
+            vprint(verbose, f"Found existing software module {module_name} with ID: {module_id}")
+        else:
+            # Debug: Print the request we're about to make
+            vprint(verbose, lambda: f"Creating software module with data: {_dumps(module_data, pretty=True).decode()}")
             
-        vprint(verbose, f"Created software module with ID: {module_id}")
-        
-        # Upload artifact
-        upload_url = f"{base_url}/rest/v1/softwaremodules/{module_id}/artifacts"
-        vprint(verbose, f"Uploading {raucb_path} to {upload_url}")
-        
-        with open(raucb_path, 'rb') as f:
-            files = {
-                'file': (os.path.basename(raucb_path), f, 'application/octet-stream')
-            }
-            upload_response = requests.post(
-                upload_url,
+            # Create software module
+            response = _hb_session.post(
+                module_url,
                 auth=(username, password),
-                files=files,
-                headers={"Accept": "application/json"}
+                data=_dumps(module_data),
+                headers=_JSON_HEADERS
             )
             
-            vprint(verbose, f"Upload response status: {upload_response.status_code}")
-            vprint(verbose, f"Upload response body: {upload_response.text}")
+            if verbose:
+                print(f"Response status: {response.status_code}")
+                print(f"Response body: {response.text}")
             
-            upload_response.raise_for_status()
+            response.raise_for_status()
+            
+            # The response should be an array of created modules
+            created_modules = _loads(response.content)
+            if not isinstance(created_modules, list) or not created_modules:
+                print("Error: Unexpected response format from server", file=sys.stderr)
+                return False
+                
+            module_id = created_modules[0].get("id")
+            if not module_id:
+                print("Error: Could not get module ID from response", file=sys.stderr)
+                return False
+                
+            vprint(verbose, f"Created software module with ID: {module_id}")
         
-        print(f"Successfully uploaded {raucb_path} to Hawkbit server")
+        if has_artifacts:
+            print(f"{raucb_path} is already on the Hawkbit server, skipping upload")
+        else:
+            # Upload artifact
+            upload_url = f"{base_url}/rest/v1/softwaremodules/{module_id}/artifacts"
+            vprint(verbose, f"Uploading {raucb_path} to {upload_url}")
+            
+            # An in-memory bundle is left open for the caller
+            bundle = contextlib.nullcontext(raucb_data) if raucb_data is not None else open(raucb_path, 'rb')
+            with bundle as f:
+                f.seek(0)
+                files = {
+                    'file': (os.path.basename(raucb_path), f, 'application/octet-stream')
+                }
+                # Stream the multipart body from the file instead of building a copy of it in memory.
+                # requests-toolbelt can only size real files, so other streams use our own encoder.
+                if MultipartEncoder is not None and raucb_data is None:
+                    encoder = MultipartEncoder(fields=files)
+                else:
+                    encoder = _MultipartFileStream('file', os.path.basename(raucb_path), f, raucb_size)
+                upload_response = _hb_session.post(
+                    upload_url,
+                    auth=(username, password),
+                    data=encoder,
+                    headers={"Content-Type": encoder.content_type, "Accept": "application/json"}
+                )
+                
+                if verbose:
+                    print(f"Upload response status: {upload_response.status_code}")
+                    print(f"Upload response body: {upload_response.text}")
+                
+                upload_response.raise_for_status()
+            
+            print(f"Successfully uploaded {raucb_path} to Hawkbit server")
         
         # Create or update a distribution set with the uploaded module and assign to all targets
-        if not create_or_update_distribution(base_url, distribution_name, module_id, username, password, assign_to_all):
+        if not create_or_update_distribution(base_url, distribution_name, module_id, username, password, assign_to_all,
+                                             verbose=verbose, targets=targets, version=dist_version):
             print("Warning: Failed to create/update or assign distribution set, but software module was uploaded", file=sys.stderr)
             return False
             
@@ -712,13 +1476,54 @@ def upload_to_hawkbit(raucb_path: str, base_url: str, username: str, password: s
         return False
 
 
+def upload_all_bundles(zip_file, base_url: str, username: str, password: str, distribution_name: str, verbose: bool = False, dist_version: Optional[str] = None, max_workers: int = 4) -> bool:
+    """
+    Upload every RAUC bundle in an artifact zip (e.g. variant builds) concurrently.
+    Each becomes its own software module and distribution set, named
+    <distribution_name>-<bundle path without .raucb>. None of them is assigned
+    to targets, as a target can only have one distribution assigned.
+    An explicit dist_version is used for every one of the sets.
+    zip_file may be a path or a seekable file object. Only a path can be
+    opened independently by each upload, so bundles from a file object are
+    uploaded one after another.
+    """
+    with zipfile.ZipFile(zip_file) as zf:
+        infos = [info for info in zf.infolist() if info.filename.endswith('.raucb')]
+    if not infos:
+        print("No RAUC bundles found in the artifact", file=sys.stderr)
+        return False
+    
+    def _upload_one(info: zipfile.ZipInfo) -> bool:
+        bundle_name = os.path.splitext(info.filename)[0].replace('/', '-')
+        # Each upload reads through its own ZipFile, as one ZipFile's open
+        # members share its file position. The bundle is streamed from the
+        # zip so concurrent uploads don't each hold one in memory.
+        with zipfile.ZipFile(zip_file) as zf, _open_zip_member(zf, info, max_in_memory=0) as stream:
+            return upload_to_hawkbit(os.path.basename(info.filename), base_url, username, password,
+                                     f"{distribution_name}-{bundle_name}", assign_to_all=False,
+                                     verbose=verbose, dist_version=dist_version, raucb_data=stream)
+    
+    workers = min(max_workers, len(infos)) if isinstance(zip_file, (str, os.PathLike)) else 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_upload_one, infos))
+    
+    print(f"Uploaded {sum(results)} out of {len(infos)} RAUC bundles")
+    return all(results)
+
+
 def vprint(verbose, *args, **kwargs):
-    """Print only if verbose is True"""
+    """
+    Print only if verbose is True.
+    Arguments may be zero-argument callables, which are only called when
+    printing, so expensive debug output costs nothing when not verbose.
+    """
     if verbose:
-        print(*args, **kwargs)
+        print(*(arg() if callable(arg) else arg for arg in args), **kwargs)
 
 
-def main():
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser (once per process)."""
     # Main parser with global arguments
     parser = argparse.ArgumentParser(description="Manage GitHub Actions artifacts for snapcast_client")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
@@ -726,15 +1531,19 @@ def main():
     
     # List command
     list_parser = subparsers.add_parser("list", help="List recent artifacts")
-    list_parser.add_argument("--token", default=os.getenv("GITHUB_TOKEN"),
+    list_parser.add_argument("--token", default=None,
                            help="GitHub token (default: $GITHUB_TOKEN)")
     list_parser.add_argument("--count", type=int, default=5,
                            help="Number of artifacts to show (default: 5)")
+    list_parser.add_argument("--name",
+                           help="Only show artifacts with this name")
+    list_parser.add_argument("--sha",
+                           help="Only show artifacts built from this (full) commit SHA")
     
     # Download command
     download_parser = subparsers.add_parser("download", help="Download an artifact")
     download_parser.add_argument("artifact_id", type=int, help="ID of the artifact to download")
-    download_parser.add_argument("--token", default=os.getenv("GITHUB_TOKEN"),
+    download_parser.add_argument("--token", default=None,
                                help="GitHub token (default: $GITHUB_TOKEN)")
     download_parser.add_argument("--output", "-o", help="Output file path")
     
@@ -745,91 +1554,153 @@ def main():
                              help="Name for the Hawkbit distribution set (default: test)")
     deploy_parser.add_argument("--no-assign", action="store_false", dest="assign_to_all",
                              help="Don't assign the distribution to all targets automatically")
-    deploy_parser.add_argument("--token", default=os.getenv("GITHUB_TOKEN"),
+    deploy_parser.add_argument("--all-bundles", action="store_true",
+                             help="Upload every .raucb bundle in the artifact as its own distribution set "
+                                  "named DISTRIBUTION_NAME-<bundle>; these are never assigned, as with --no-assign")
+    deploy_parser.add_argument("--dist-version",
+                             help="Create the distribution set with this version (e.g. the artifact ID) "
+                                  "instead of looking up the next free one; numeric versions get a 'v' "
+                                  "prefix so they don't affect the automatic version series")
+    deploy_parser.add_argument("--token", default=None,
                              help="GitHub token (default: $GITHUB_TOKEN)")
-    deploy_parser.add_argument("--hawkbit-url", default=os.getenv("HAWKBIT_URL", "http://192.168.2.44:8080"),
+    deploy_parser.add_argument("--hawkbit-url", default=None,
                              help="Hawkbit server URL (default: $HAWKBIT_URL or http://192.168.2.44:8080)")
-    deploy_parser.add_argument("--username", default=os.getenv("HAWKBIT_USERNAME", "admin"),
+    deploy_parser.add_argument("--username", default=None,
                              help="Hawkbit username (default: $HAWKBIT_USERNAME or admin)")
-    deploy_parser.add_argument("--password", default=os.getenv("HAWKBIT_PASSWORD", "admin"),
+    deploy_parser.add_argument("--password", default=None,
                              help="Hawkbit password (default: $HAWKBIT_PASSWORD or admin)")
     
     # Status command
     status_parser = subparsers.add_parser("status", help="Show status of all Hawkbit targets")
-    status_parser.add_argument("--hawkbit-url", default=os.getenv("HAWKBIT_URL", "http://192.168.2.44:8080"),
+    status_parser.add_argument("--hawkbit-url", default=None,
                              help="Hawkbit server URL (default: $HAWKBIT_URL or http://192.168.2.44:8080)")
-    status_parser.add_argument("--username", default=os.getenv("HAWKBIT_USERNAME", "admin"),
+    status_parser.add_argument("--username", default=None,
                              help="Hawkbit username (default: $HAWKBIT_USERNAME or admin)")
-    status_parser.add_argument("--password", default=os.getenv("HAWKBIT_PASSWORD", "admin"),
+    status_parser.add_argument("--password", default=None,
                              help="Hawkbit password (default: $HAWKBIT_PASSWORD or admin)")
     
-    args = parser.parse_args()
+    return parser
+
+
+# Options whose defaults come from the environment, read after parsing so the
+# environment is only consulted for options that weren't given
+_ENV_DEFAULTS = {
+    "token": ("GITHUB_TOKEN", None),
+    "hawkbit_url": ("HAWKBIT_URL", "http://192.168.2.44:8080"),
+    "username": ("HAWKBIT_USERNAME", "admin"),
+    "password": ("HAWKBIT_PASSWORD", "admin"),
+}
+
+
+def _cmd_list(args: argparse.Namespace) -> None:
+    if not list_artifacts(token=args.token, count=args.count, name=args.name, sha=args.sha):
+        print("No artifacts found or error occurred.")
+
+
+def _cmd_download(args: argparse.Namespace) -> None:
+    if not args.token:
+        print("Error: GitHub token is required. Set GITHUB_TOKEN environment variable or use --token", file=sys.stderr)
+        sys.exit(1)
     
-    if args.command == "list":
-        if not list_artifacts(token=args.token, count=args.count):
-            print("No artifacts found or error occurred.")
-            return
-            
-    elif args.command == "download":
-        if not args.token:
-            print("Error: GitHub token is required. Set GITHUB_TOKEN environment variable or use --token", file=sys.stderr)
-            sys.exit(1)
-            
-        success = download_artifact(
-            artifact_id=args.artifact_id,
-            token=args.token,
-            output_path=args.output
-        )
-        
-        if not success:
-            sys.exit(1)
+    success = download_artifact(
+        artifact_id=args.artifact_id,
+        token=args.token,
+        output_path=args.output
+    )
     
-    elif args.command == "deploy":
-        if not args.token:
-            print("Error: GitHub token is required. Set GITHUB_TOKEN environment variable or use --token", file=sys.stderr)
+    if not success:
+        sys.exit(1)
+
+
+def _cmd_deploy(args: argparse.Namespace) -> None:
+    if not args.token:
+        print("Error: GitHub token is required. Set GITHUB_TOKEN environment variable or use --token", file=sys.stderr)
+        sys.exit(1)
+    
+    try:
+        base_url = args.hawkbit_url.rstrip('/')
+        
+        # Fail fast on an unreachable server or bad credentials, not after the download.
+        # Only a plain deploy looks up distribution_name later, so only it has
+        # the check do that lookup; the other modes get the cheaper probe.
+        lookup_name = None if args.all_bundles or args.dist_version else args.distribution_name
+        if not check_hawkbit_ready(base_url, args.username, args.password, distribution_name=lookup_name,
+                                   verbose=args.verbose):
             sys.exit(1)
         
-        # Create a temporary directory for the artifact
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Download the artifact
-            artifact_zip = os.path.join(temp_dir, f"artifact_{args.artifact_id}.zip")
-            if not download_artifact(
-                artifact_id=args.artifact_id,
-                token=args.token,
-                output_path=artifact_zip
-            ):
-                sys.exit(1)
-            
-            # Extract the artifact
-            try:
-                extract_dir = extract_zip(artifact_zip)
-                raucb_file = find_raucb_file(extract_dir)
-                vprint(args.verbose, f"Found RAUC bundle: {raucb_file}")
-                
-                # Upload to Hawkbit and create distribution
-                if not upload_to_hawkbit(
-                    raucb_path=raucb_file,
-                    base_url=args.hawkbit_url.rstrip('/'),
-                    username=args.username,
-                    password=args.password,
-                    distribution_name=args.distribution_name,
-                    assign_to_all=args.assign_to_all,
-                    verbose=args.verbose
-                ):
+        if args.all_bundles:
+            with _open_artifact_zip(args.artifact_id, args.token) as zip_file:
+                if zip_file is None:
                     sys.exit(1)
-                    
-            except Exception as e:
-                print(f"Error during deployment: {e}", file=sys.stderr)
-                sys.exit(1)
-    
-    elif args.command == "status":
-        if not show_all_targets_status(
-            base_url=args.hawkbit_url.rstrip('/'),
-            username=args.username,
-            password=args.password,
-            verbose=args.verbose
-        ):
-            sys.exit(1)
+                if not upload_all_bundles(zip_file, base_url, args.username, args.password,
+                                          args.distribution_name, verbose=args.verbose,
+                                          dist_version=args.dist_version):
+                    sys.exit(1)
+        else:
+            # Download the artifact and open the RAUC bundle in it. Listing the
+            # Hawkbit targets doesn't need the bundle, so do that meanwhile.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                targets_future = None
+                if args.assign_to_all:
+                    targets_future = executor.submit(get_all_targets, base_url, args.username, args.password,
+                                                     verbose=args.verbose)
+                with _open_artifact_raucb(args.artifact_id, args.token) as raucb:
+                    if not raucb:
+                        sys.exit(1)
+                    raucb_name, raucb_data = raucb
+                    vprint(args.verbose, f"Found RAUC bundle: {raucb_name}")
+                
+                    # Upload to Hawkbit straight from the zip and create distribution
+                    if not upload_to_hawkbit(
+                        raucb_path=raucb_name,
+                        base_url=base_url,
+                        username=args.username,
+                        password=args.password,
+                        distribution_name=args.distribution_name,
+                        assign_to_all=args.assign_to_all,
+                        verbose=args.verbose,
+                        dist_version=args.dist_version,
+                        targets=targets_future.result() if targets_future else None,
+                        raucb_data=raucb_data
+                    ):
+                        sys.exit(1)
+        
+    except Exception as e:
+        print(f"Error during deployment: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _cmd_status(args: argparse.Namespace) -> None:
+    if not show_all_targets_status(
+        base_url=args.hawkbit_url.rstrip('/'),
+        username=args.username,
+        password=args.password,
+        verbose=args.verbose
+    ):
+        sys.exit(1)
+
+
+# Subcommand handlers by name
+_COMMANDS = {
+    "list": _cmd_list,
+    "download": _cmd_download,
+    "deploy": _cmd_deploy,
+    "status": _cmd_status,
+}
+
+
+def main():
+    args = _build_parser().parse_args()
+    for option, (env_var, default) in _ENV_DEFAULTS.items():
+        if option in vars(args) and getattr(args, option) is None:
+            setattr(args, option, os.environ.get(env_var, default))
+    
+    try:
+        _COMMANDS[args.command](args)
+    finally:
+        # Release the pooled keep-alive connections
+        _gh_session.close()
+        _hb_session.close()
 
 
 if __name__ == "__main__":